@@ -1,26 +1,83 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
+from flask.logging import default_handler
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 import os
+import json
+import time
+import atexit
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import orjson
 from config import Config
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, which encodes datetimes natively"""
+    
+    # orjson takes no stdlib-style options; callers that pass them (e.g. the session
+    # serializer's separators/object_hook) get the stdlib json module instead
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), mimetype='application/json')
+
 app = Flask(__name__)
 app.config.from_object(Config)
+app.json = OrjsonProvider(app)
+
+if not app.debug:
+    # Compiled templates persist across worker restarts; source files are not re-checked
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    jinja_cache_dir = app.config['JINJA_CACHE_DIR']
+    if jinja_cache_dir:
+        os.makedirs(jinja_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
 
 from models import db, User, Task
 
 db.init_app(app)
 
 if not app.debug:
+    # Skip per-record caller/thread/process introspection; messages carry their own context
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    # Flask's stderr handler formats %(module)s, which would now always read "(unknown file)"
+    default_handler.setFormatter(logging.Formatter('[%(asctime)s] %(levelname)s: %(message)s'))
+    
     if not os.path.exists('logs'):
         os.mkdir('logs')
     file_handler = RotatingFileHandler('logs/taskmanager.log', maxBytes=10240, backupCount=10)
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'))
+    file_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s: %(message)s'))
     file_handler.setLevel(logging.INFO)
-    app.logger.addHandler(file_handler)
+    
+    # Request threads only enqueue records; a background listener does the disk and
+    # stderr writes, so Flask's default stderr handler moves behind the queue too
+    log_queue = queue.Queue(-1)
+    app.logger.removeHandler(default_handler)
+    app.logger.addHandler(QueueHandler(log_queue))
+    log_listener = QueueListener(log_queue, file_handler, default_handler, respect_handler_level=True)
+    log_listener.start()
+    atexit.register(log_listener.stop)
     app.logger.setLevel(logging.INFO)
     app.logger.info('Task Manager API startup')
 from routes import api
@@ -29,14 +86,30 @@ from web_routes import web
 app.register_blueprint(api, url_prefix='/api')
 app.register_blueprint(web)
 
+# A successful DB probe is trusted for this many seconds, so frequent
+# liveness checks don't each take a pool connection
+HEALTH_CHECK_INTERVAL = 5
+_last_db_ok = 0.0
+
 @app.route('/health')
 def health_check():
+    global _last_db_ok
     try:
-        db.session.execute(db.text('SELECT 1'))
-        return jsonify({'status': 'healthy', 'database': 'connected', 'timestamp': datetime.utcnow().isoformat()}), 200
+        if time.monotonic() - _last_db_ok >= HEALTH_CHECK_INTERVAL:
+            db.session.execute(db.text('SELECT 1'))
+            _last_db_ok = time.monotonic()
     except Exception as e:
         app.logger.error(f'Health check failed: {str(e)}')
         return jsonify({'status': 'unhealthy', 'database': 'disconnected', 'timestamp': datetime.utcnow().isoformat()}), 503
+    
+    health = {'status': 'healthy', 'database': 'connected', 'timestamp': datetime.utcnow().isoformat()}
+    
+    # Only QueuePool tracks checkouts; NullPool/StaticPool (e.g. behind pgbouncer) have no stats
+    pool = db.engine.pool
+    if isinstance(pool, QueuePool):
+        health['pool'] = {'size': pool.size(), 'checked_out': pool.checkedout(), 'overflow': max(pool.overflow(), 0)}
+    
+    return jsonify(health), 200
 
 @app.errorhandler(404)
 def not_found(error):
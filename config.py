@@ -9,12 +9,24 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DEBUG = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    # Werkzeug hash method, e.g. 'pbkdf2:sha256:600000'; tune the iteration count so
+    # one hash takes ~100ms on the target hardware (users.password_hash holds 128 chars)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    
+    # Jinja bytecode cache location outside debug mode (None uses a per-user temp directory)
+    JINJA_CACHE_DIR = os.environ.get('JINJA_CACHE_DIR')
+    
     # Database connection pool settings
+    # Each Gunicorn worker has its own pool, so size it to the worker's thread count
+    GUNICORN_THREADS = int(os.environ.get('GUNICORN_THREADS', '8'))
     SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-        'pool_size': 10,
-        'max_overflow': 20
+        'pool_recycle': 280,
+        'pool_timeout': 5,
+        'pool_size': GUNICORN_THREADS,
+        'max_overflow': GUNICORN_THREADS,
+        'connect_args': {'options': '-c statement_timeout=10000'},
+        # Compiled statement cache per engine (SQLAlchemy default is 500)
+        'query_cache_size': 1200
     }
 
 class DevelopmentConfig(Config):
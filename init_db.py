@@ -7,7 +7,7 @@ Creates tables and optionally populates with sample data
 import os
 import sys
 from datetime import datetime, timedelta
-from flask import Flask
+from flask import Flask, current_app
 from models import db, User, Task, TaskStatus, TaskPriority
 from config import Config
 
@@ -53,17 +53,24 @@ def populate_sample_data():
         }
     ]
     
-    users = []
+    # Hash passwords upfront, then insert all users in one batch
+    users_prepared = []
     for user_data in users_data:
-        user = User(
-            username=user_data['username'],
-            email=user_data['email']
-        )
-        user.set_password(user_data['password'])
-        db.session.add(user)
-        users.append(user)
+        user = User()
+        user.set_password(user_data['password'], current_app.config['PASSWORD_HASH_METHOD'])
+        users_prepared.append({
+            'username': user_data['username'],
+            'email': user_data['email'],
+            'password_hash': user.password_hash
+        })
     
-    db.session.flush()  # Flush to get user IDs
+    db.session.execute(db.insert(User), users_prepared)
+    
+    # Recover the generated IDs in insertion order for the tasks batch
+    ids_by_username = dict(db.session.execute(
+        db.select(User.username, User.id).where(User.username.in_([u['username'] for u in users_data]))
+    ).all())
+    user_ids = [ids_by_username[u['username']] for u in users_data]
     
     # Create sample tasks
     tasks_data = [
@@ -72,7 +79,7 @@ def populate_sample_data():
             'description': 'Configure GitHub Actions for automated testing and deployment',
             'status': TaskStatus.IN_PROGRESS,
             'priority': TaskPriority.HIGH,
-            'user_id': users[0].id,
+            'user_id': user_ids[0],
             'due_date': datetime.utcnow() + timedelta(days=3)
         },
         {
@@ -80,7 +87,7 @@ def populate_sample_data():
             'description': 'Create comprehensive API documentation using OpenAPI/Swagger',
             'status': TaskStatus.PENDING,
             'priority': TaskPriority.MEDIUM,
-            'user_id': users[0].id,
+            'user_id': user_ids[0],
             'due_date': datetime.utcnow() + timedelta(days=7)
         },
         {
@@ -88,7 +95,7 @@ def populate_sample_data():
             'description': 'Review pull requests for the authentication module',
             'status': TaskStatus.COMPLETED,
             'priority': TaskPriority.HIGH,
-            'user_id': users[1].id,
+            'user_id': user_ids[1],
             'completed_at': datetime.utcnow() - timedelta(days=1)
         },
         {
@@ -96,7 +103,7 @@ def populate_sample_data():
             'description': 'Set up staging environment on AWS ECS',
             'status': TaskStatus.PENDING,
             'priority': TaskPriority.HIGH,
-            'user_id': users[1].id,
+            'user_id': user_ids[1],
             'due_date': datetime.utcnow() + timedelta(days=2)
         },
         {
@@ -104,7 +111,7 @@ def populate_sample_data():
             'description': 'Increase test coverage for user authentication endpoints',
             'status': TaskStatus.IN_PROGRESS,
             'priority': TaskPriority.MEDIUM,
-            'user_id': users[2].id,
+            'user_id': user_ids[2],
             'due_date': datetime.utcnow() + timedelta(days=5)
         },
         {
@@ -112,7 +119,7 @@ def populate_sample_data():
             'description': 'Load test the API endpoints with various scenarios',
             'status': TaskStatus.PENDING,
             'priority': TaskPriority.LOW,
-            'user_id': users[2].id,
+            'user_id': user_ids[2],
             'due_date': datetime.utcnow() + timedelta(days=10)
         },
         {
@@ -120,7 +127,7 @@ def populate_sample_data():
             'description': 'Migrate user data from legacy system',
             'status': TaskStatus.COMPLETED,
             'priority': TaskPriority.HIGH,
-            'user_id': users[1].id,
+            'user_id': user_ids[1],
             'completed_at': datetime.utcnow() - timedelta(days=3)
         },
         {
@@ -128,28 +135,20 @@ def populate_sample_data():
             'description': 'Conduct security review of authentication and authorization',
             'status': TaskStatus.PENDING,
             'priority': TaskPriority.HIGH,
-            'user_id': users[0].id,
+            'user_id': user_ids[0],
             'due_date': datetime.utcnow() + timedelta(days=14)
         }
     ]
     
-    for task_data in tasks_data:
-        task = Task(
-            title=task_data['title'],
-            description=task_data['description'],
-            status=task_data['status'],
-            priority=task_data['priority'],
-            user_id=task_data['user_id']
-        )
-        if 'due_date' in task_data:
-            task.due_date = task_data['due_date']
-        if 'completed_at' in task_data:
-            task.completed_at = task_data['completed_at']
-        
-        db.session.add(task)
+    # Every row needs the same keys for a single executemany INSERT
+    tasks_prepared = [
+        {'due_date': None, 'completed_at': None, **task_data}
+        for task_data in tasks_data
+    ]
+    db.session.execute(db.insert(Task), tasks_prepared)
     
     db.session.commit()
-    print(f"Created {len(users)} users and {len(tasks_data)} tasks")
+    print(f"Created {len(user_ids)} users and {len(tasks_data)} tasks")
 
 def main():
     """Main function to run database initialization"""
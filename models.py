@@ -15,6 +15,10 @@ class TaskPriority(enum.Enum):
     MEDIUM = "medium"
     HIGH = "high"
 
+# Request-value lookups; a dict miss is cheaper than Enum(value) raising ValueError
+STATUS_BY_VALUE = {status.value: status for status in TaskStatus}
+PRIORITY_BY_VALUE = {priority.value: priority for priority in TaskPriority}
+
 class User(db.Model):
     __tablename__ = 'users'
     
@@ -26,10 +30,10 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
-    tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
+    tasks = db.relationship('Task', back_populates='user', lazy=True, cascade='all, delete-orphan')
     
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method='pbkdf2'):
+        self.password_hash = generate_password_hash(password, method=method)
     
     def check_password(self, password):
         return check_password_hash(self.password_hash, password)
@@ -39,19 +43,28 @@ class User(db.Model):
             'id': self.id,
             'username': self.username,
             'email': self.email,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_active': self.is_active,
             'task_count': len(self.tasks)
         }
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Listings order by (created_at, id) DESC and seek past a (created_at, id)
+        # cursor, so the indexes carry id as the tiebreaker column
+        db.Index('ix_tasks_created_at', 'created_at', 'id'),
+        # Covers per-user listings ordered by recency, and plain user_id lookups
+        db.Index('ix_task_user_created', 'user_id', 'created_at', 'id'),
+        # Partial index for pending-task listings ordered by recency (enum stores member names)
+        db.Index('ix_tasks_pending', 'created_at', 'id', postgresql_where=db.text("status = 'PENDING'")),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    status = db.Column(db.Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False)
+    status = db.Column(db.Enum(TaskStatus), default=TaskStatus.PENDING, nullable=False, index=True)
     priority = db.Column(db.Enum(TaskPriority), default=TaskPriority.MEDIUM, nullable=False)
     due_date = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -59,6 +72,7 @@ class Task(db.Model):
     completed_at = db.Column(db.DateTime)
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user = db.relationship('User', back_populates='tasks')
     
     def to_dict(self):
         return {
@@ -67,10 +81,10 @@ class Task(db.Model):
             'description': self.description,
             'status': self.status.value,
             'priority': self.priority.value,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'due_date': self.due_date,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'completed_at': self.completed_at,
             'user_id': self.user_id,
             'user': self.user.username if self.user else None
         }
\ No newline at end of file
@@ -0,0 +1,103 @@
+from models import db, User, Task, TaskStatus, TaskPriority
+from sqlalchemy import String, Text, case, cast, func
+from sqlalchemy.orm import selectinload, raiseload
+from datetime import datetime
+
+# Task listing queries shared by the API and web blueprints. Building every
+# listing from the same filters and ordering keeps one compiled-statement
+# cache entry per shape and lets query changes land in a single place.
+
+TASK_ORDER = (Task.created_at.desc(), Task.id.desc())
+
+def task_filters(*, user_id=None, status=None, priority=None):
+    # status and priority are already-resolved enum members
+    filters = []
+    if user_id:
+        filters.append(Task.user_id == user_id)
+    if status is not None:
+        filters.append(Task.status == status)
+    if priority is not None:
+        filters.append(Task.priority == priority)
+    return filters
+
+def build_tasks_query(*, user_id=None, status=None, priority=None):
+    # ORM listing with owners eager-loaded; raiseload('*') turns any other lazy load into an error
+    return (
+        db.select(Task)
+        .options(selectinload(Task.user), raiseload('*'))
+        .where(*task_filters(user_id=user_id, status=status, priority=priority))
+        .order_by(*TASK_ORDER)
+    )
+
+def iso_timestamp(column):
+    # Renders a timestamp exactly like datetime.isoformat() (and orjson), which
+    # the single-row endpoints use: microseconds appear only when non-zero
+    return func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS', type_=String) + case(
+        (func.to_char(column, 'US') != '000000', func.to_char(column, '.US', type_=String)),
+        else_=''
+    )
+
+def enum_value(column, enum_cls):
+    # Enum columns store member names; map each back to its API value as to_dict() does
+    return case({member.name: member.value for member in enum_cls}, value=cast(column, String))
+
+def task_json_select():
+    # Builds the Task.to_dict() payload inside PostgreSQL so listing rows arrive
+    # as ready-to-send JSON text with no ORM hydration.
+    return db.select(
+        cast(func.json_build_object(
+            'id', Task.id,
+            'title', Task.title,
+            'description', Task.description,
+            'status', enum_value(Task.status, TaskStatus),
+            'priority', enum_value(Task.priority, TaskPriority),
+            'due_date', iso_timestamp(Task.due_date),
+            'created_at', iso_timestamp(Task.created_at),
+            'updated_at', iso_timestamp(Task.updated_at),
+            'completed_at', iso_timestamp(Task.completed_at),
+            'user_id', Task.user_id,
+            'user', User.username
+        ), Text).label('data'),
+        Task.created_at,
+        Task.id
+    ).join(User)
+
+def paginate_task_json(filters, page, per_page, cursor=None):
+    # LIMIT, the page count and the keyset look-ahead row all need a positive page size
+    per_page = max(per_page, 1)
+    stmt = task_json_select().where(*filters).order_by(*TASK_ORDER)
+    
+    if cursor is None:
+        page = max(page, 1)
+        rows = db.session.execute(stmt.limit(per_page).offset((page - 1) * per_page)).scalars().all()
+        total = db.session.execute(
+            db.select(func.count()).select_from(Task).where(*filters)
+        ).scalar()
+        return rows, {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': -(-total // per_page)
+        }
+    
+    # Keyset mode: seek past the (created_at, id) cursor instead of OFFSET, and
+    # fetch one extra row to detect a next page without a COUNT(*) query
+    if cursor:
+        created_at, _, last_id = cursor.rpartition('_')
+        stmt = stmt.where(
+            db.tuple_(Task.created_at, Task.id) < (datetime.fromisoformat(created_at), int(last_id))
+        )
+    
+    rows = db.session.execute(stmt.limit(per_page + 1)).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    next_cursor = None
+    if has_more:
+        next_cursor = f'{rows[-1].created_at.isoformat()}_{rows[-1].id}'
+    
+    return [row.data for row in rows], {
+        'per_page': per_page,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
@@ -1,13 +1,27 @@
-from flask import Blueprint, request, jsonify, current_app
-from models import db, User, Task, TaskStatus, TaskPriority
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from models import db, User, Task, TaskStatus, TaskPriority, STATUS_BY_VALUE, PRIORITY_BY_VALUE
+from queries import task_filters, paginate_task_json
+from sqlalchemy import case, func
+from sqlalchemy.orm import selectinload
+from cachetools import TTLCache
 from datetime import datetime
 import re
+import threading
 
 api = Blueprint('api', __name__)
 
+# Dashboard stats tolerate a few seconds of staleness; writes invalidate explicitly
+_stats_cache = TTLCache(maxsize=1, ttl=15)
+_stats_lock = threading.Lock()
+
+# Validation lookups built once at import instead of per request
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_VALID_STATUSES_STR = ', '.join(status.value for status in TaskStatus)
+_VALID_PRIORITIES_STR = ', '.join(priority.value for priority in TaskPriority)
+_TRANSITION_FIELDS = frozenset({'status', 'priority'})
+
 def validate_email(email):
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
 def validate_user_data(data, required_fields=None):
     if required_fields is None:
@@ -39,17 +53,110 @@ def validate_task_data(data, required_fields=None):
         errors.append('Title cannot be empty')
     
     if 'status' in data and data['status']:
-        valid_statuses = [status.value for status in TaskStatus]
-        if data['status'] not in valid_statuses:
-            errors.append(f'Status must be one of: {", ".join(valid_statuses)}')
+        if data['status'] not in STATUS_BY_VALUE:
+            errors.append(f'Status must be one of: {_VALID_STATUSES_STR}')
     
     if 'priority' in data and data['priority']:
-        valid_priorities = [priority.value for priority in TaskPriority]
-        if data['priority'] not in valid_priorities:
-            errors.append(f'Priority must be one of: {", ".join(valid_priorities)}')
+        if data['priority'] not in PRIORITY_BY_VALUE:
+            errors.append(f'Priority must be one of: {_VALID_PRIORITIES_STR}')
     
     return errors
 
+def invalidate_dashboard_stats():
+    with _stats_lock:
+        _stats_cache.pop('stats', None)
+
+def compute_dashboard_stats():
+    with _stats_lock:
+        stats = _stats_cache.get('stats')
+    if stats is not None:
+        return stats
+    
+    # One pass over tasks with conditional aggregation; users counted in a scalar subquery
+    row = db.session.execute(db.select(
+        db.select(func.count()).select_from(User).scalar_subquery().label('total_users'),
+        func.count().label('total_tasks'),
+        func.count().filter(Task.status == TaskStatus.PENDING).label('pending_tasks'),
+        func.count().filter(Task.status == TaskStatus.IN_PROGRESS).label('in_progress_tasks'),
+        func.count().filter(Task.status == TaskStatus.COMPLETED).label('completed_tasks'),
+    ).select_from(Task)).one()
+    stats = dict(row._mapping)
+    
+    with _stats_lock:
+        _stats_cache['stats'] = stats
+    return stats
+
+def update_task_transition(task_id, data):
+    # Mirrors the ORM path: completed_at is stamped on entering COMPLETED,
+    # cleared on leaving it and otherwise kept, decided in SQL against the old status
+    now = datetime.utcnow()
+    values = {'updated_at': now}
+    
+    if 'status' in data:
+        status = STATUS_BY_VALUE[data['status']]
+        values['status'] = status
+        if status == TaskStatus.COMPLETED:
+            values['completed_at'] = case(
+                (Task.status == TaskStatus.COMPLETED, Task.completed_at), else_=now)
+        else:
+            values['completed_at'] = case(
+                (Task.status == TaskStatus.COMPLETED, None), else_=Task.completed_at)
+    
+    if 'priority' in data:
+        values['priority'] = PRIORITY_BY_VALUE[data['priority']]
+    
+    stmt = db.update(Task).where(Task.id == task_id).values(**values).returning(Task)
+    return db.session.execute(stmt).scalar_one_or_none()
+
+def conditional_json(etag, build_data):
+    # Answer a matching If-None-Match with 304 before serializing anything
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_data())
+    response.set_etag(etag, weak=True)
+    return response
+
+def stream_tasks_json(task_rows, pagination, **fields):
+    # task_rows are JSON text built by PostgreSQL and are written through verbatim
+    dumps = current_app.json.dumps
+    yield '{' + ''.join(f'{dumps(key)}:{dumps(value)},' for key, value in fields.items()) + '"tasks":['
+    for i, row in enumerate(task_rows):
+        yield (',' if i else '') + row
+    yield '],"pagination":' + dumps(pagination) + '}'
+
+def task_list_response(user_id, **fields):
+    # Shared by the task list endpoints: parses the paging/filter query args and
+    # streams the page, or returns a 400 for an invalid filter or cursor
+    page = request.args.get('page', 1, type=int)
+    per_page = max(1, min(request.args.get('per_page', 10, type=int), 100))
+    status = request.args.get('status')
+    priority = request.args.get('priority')
+    
+    status_enum = None
+    if status:
+        status_enum = STATUS_BY_VALUE.get(status)
+        if status_enum is None:
+            return jsonify({'error': f'Invalid status: {status}'}), 400
+    
+    priority_enum = None
+    if priority:
+        priority_enum = PRIORITY_BY_VALUE.get(priority)
+        if priority_enum is None:
+            return jsonify({'error': f'Invalid priority: {priority}'}), 400
+    
+    filters = task_filters(user_id=user_id, status=status_enum, priority=priority_enum)
+    
+    # Clients passing ?cursor= (empty for the first page) get keyset
+    # pagination without the total/pages COUNT(*)
+    try:
+        rows, pagination = paginate_task_json(filters, page, per_page, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    
+    return Response(stream_with_context(stream_tasks_json(rows, pagination, **fields)),
+                    status=200, mimetype='application/json')
+
 # User endpoints
 @api.route('/users', methods=['GET'])
 def get_users():
@@ -57,7 +164,7 @@ def get_users():
         page = request.args.get('page', 1, type=int)
         per_page = min(request.args.get('per_page', 10, type=int), 100)
         
-        users = User.query.paginate(
+        users = User.query.options(selectinload(User.tasks)).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
@@ -78,7 +185,13 @@ def get_users():
 def get_user(user_id):
     try:
         user = User.query.get_or_404(user_id)
-        return jsonify(user.to_dict()), 200
+        # task_count is part of the payload but doesn't touch users.updated_at; count in
+        # SQL so a 304 doesn't load the tasks relationship that only to_dict() needs
+        task_count = db.session.execute(
+            db.select(func.count()).select_from(Task).where(Task.user_id == user.id)
+        ).scalar()
+        etag = f'user-{user.id}-{user.updated_at.timestamp()}-{task_count}'
+        return conditional_json(etag, user.to_dict)
     except Exception as e:
         current_app.logger.error(f'Error fetching user {user_id}: {str(e)}')
         return jsonify({'error': 'User not found'}), 404
@@ -94,22 +207,29 @@ def create_user():
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
-        if User.query.filter_by(username=data['username']).first():
+        existing = db.session.execute(
+            db.select(User.username, User.email).where(
+                (User.username == data['username']) | (User.email == data['email'])
+            )
+        ).all()
+        
+        if any(u.username == data['username'] for u in existing):
             return jsonify({'error': 'Username already exists'}), 409
         
-        if User.query.filter_by(email=data['email']).first():
+        if any(u.email == data['email'] for u in existing):
             return jsonify({'error': 'Email already exists'}), 409
         
         user = User(
             username=data['username'],
             email=data['email']
         )
-        user.set_password(data['password'])
+        user.set_password(data['password'], current_app.config['PASSWORD_HASH_METHOD'])
         
         db.session.add(user)
         db.session.commit()
+        invalidate_dashboard_stats()
         
-        current_app.logger.info(f'User created: {user.username}')
+        current_app.logger.info('User created: %s', user.username)
         return jsonify(user.to_dict()), 201
     
     except Exception as e:
@@ -130,18 +250,33 @@ def update_user(user_id):
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
-        if 'username' in data and data['username'] != user.username:
-            if User.query.filter_by(username=data['username']).first():
+        username_changed = 'username' in data and data['username'] != user.username
+        email_changed = 'email' in data and data['email'] != user.email
+        
+        conflicts = []
+        if username_changed:
+            conflicts.append(User.username == data['username'])
+        if email_changed:
+            conflicts.append(User.email == data['email'])
+        
+        existing = []
+        if conflicts:
+            existing = db.session.execute(
+                db.select(User.username, User.email).where(db.or_(*conflicts))
+            ).all()
+        
+        if username_changed:
+            if any(u.username == data['username'] for u in existing):
                 return jsonify({'error': 'Username already exists'}), 409
             user.username = data['username']
         
-        if 'email' in data and data['email'] != user.email:
-            if User.query.filter_by(email=data['email']).first():
+        if email_changed:
+            if any(u.email == data['email'] for u in existing):
                 return jsonify({'error': 'Email already exists'}), 409
             user.email = data['email']
         
         if 'password' in data and data['password']:
-            user.set_password(data['password'])
+            user.set_password(data['password'], current_app.config['PASSWORD_HASH_METHOD'])
         
         if 'is_active' in data:
             user.is_active = bool(data['is_active'])
@@ -149,7 +284,7 @@ def update_user(user_id):
         user.updated_at = datetime.utcnow()
         db.session.commit()
         
-        current_app.logger.info(f'User updated: {user.username}')
+        current_app.logger.info('User updated: %s', user.username)
         return jsonify(user.to_dict()), 200
     
     except Exception as e:
@@ -165,8 +300,9 @@ def delete_user(user_id):
         
         db.session.delete(user)
         db.session.commit()
+        invalidate_dashboard_stats()
         
-        current_app.logger.info(f'User deleted: {username}')
+        current_app.logger.info('User deleted: %s', username)
         return jsonify({'message': 'User deleted successfully'}), 200
     
     except Exception as e:
@@ -178,44 +314,7 @@ def delete_user(user_id):
 @api.route('/tasks', methods=['GET'])
 def get_tasks():
     try:
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)
-        user_id = request.args.get('user_id', type=int)
-        status = request.args.get('status')
-        priority = request.args.get('priority')
-        
-        query = Task.query
-        
-        if user_id:
-            query = query.filter_by(user_id=user_id)
-        
-        if status:
-            try:
-                status_enum = TaskStatus(status)
-                query = query.filter_by(status=status_enum)
-            except ValueError:
-                return jsonify({'error': f'Invalid status: {status}'}), 400
-        
-        if priority:
-            try:
-                priority_enum = TaskPriority(priority)
-                query = query.filter_by(priority=priority_enum)
-            except ValueError:
-                return jsonify({'error': f'Invalid priority: {priority}'}), 400
-        
-        tasks = query.order_by(Task.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'tasks': [task.to_dict() for task in tasks.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': tasks.total,
-                'pages': tasks.pages
-            }
-        }), 200
+        return task_list_response(request.args.get('user_id', type=int))
     
     except Exception as e:
         current_app.logger.error(f'Error fetching tasks: {str(e)}')
@@ -225,7 +324,9 @@ def get_tasks():
 def get_task(task_id):
     try:
         task = Task.query.get_or_404(task_id)
-        return jsonify(task.to_dict()), 200
+        # The payload embeds the owner's username, so a user rename changes it too
+        etag = f'task-{task.id}-{task.updated_at.timestamp()}-{task.user.updated_at.timestamp()}'
+        return conditional_json(etag, task.to_dict)
     except Exception as e:
         current_app.logger.error(f'Error fetching task {task_id}: {str(e)}')
         return jsonify({'error': 'Task not found'}), 404
@@ -241,8 +342,7 @@ def create_task():
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
-        user = User.query.get(data['user_id'])
-        if not user:
+        if not db.session.query(db.exists().where(User.id == data['user_id'])).scalar():
             return jsonify({'error': 'User not found'}), 404
         
         task = Task(
@@ -252,10 +352,10 @@ def create_task():
         )
         
         if 'status' in data:
-            task.status = TaskStatus(data['status'])
+            task.status = STATUS_BY_VALUE[data['status']]
         
         if 'priority' in data:
-            task.priority = TaskPriority(data['priority'])
+            task.priority = PRIORITY_BY_VALUE[data['priority']]
         
         if 'due_date' in data and data['due_date']:
             try:
@@ -265,9 +365,11 @@ def create_task():
         
         db.session.add(task)
         db.session.commit()
+        invalidate_dashboard_stats()
         
-        current_app.logger.info(f'Task created: {task.title} for user {user.username}')
-        return jsonify(task.to_dict()), 201
+        task_data = task.to_dict()
+        current_app.logger.info('Task created: %s for user %s', task.title, task_data['user'])
+        return jsonify(task_data), 201
     
     except Exception as e:
         db.session.rollback()
@@ -277,7 +379,6 @@ def create_task():
 @api.route('/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
     try:
-        task = Task.query.get_or_404(task_id)
         data = request.get_json()
         
         if not data:
@@ -287,6 +388,22 @@ def update_task(task_id):
         if errors:
             return jsonify({'error': 'Validation failed', 'details': errors}), 400
         
+        # Status/priority transitions go out as a single UPDATE ... RETURNING
+        if data.keys() <= _TRANSITION_FIELDS and all(data.values()):
+            task = update_task_transition(task_id, data)
+            if task is None:
+                return jsonify({'error': 'Task not found'}), 404
+            
+            # Serialize before commit expires the RETURNING-loaded row
+            task_data = task.to_dict()
+            db.session.commit()
+            invalidate_dashboard_stats()
+            
+            current_app.logger.info('Task updated: %s', task_data['title'])
+            return jsonify(task_data), 200
+        
+        task = Task.query.get_or_404(task_id)
+        
         if 'title' in data:
             task.title = data['title']
         
@@ -295,7 +412,7 @@ def update_task(task_id):
         
         if 'status' in data:
             old_status = task.status
-            task.status = TaskStatus(data['status'])
+            task.status = STATUS_BY_VALUE[data['status']]
             
             if old_status != TaskStatus.COMPLETED and task.status == TaskStatus.COMPLETED:
                 task.completed_at = datetime.utcnow()
@@ -303,7 +420,7 @@ def update_task(task_id):
                 task.completed_at = None
         
         if 'priority' in data:
-            task.priority = TaskPriority(data['priority'])
+            task.priority = PRIORITY_BY_VALUE[data['priority']]
         
         if 'due_date' in data:
             if data['due_date']:
@@ -316,8 +433,9 @@ def update_task(task_id):
         
         task.updated_at = datetime.utcnow()
         db.session.commit()
+        invalidate_dashboard_stats()
         
-        current_app.logger.info(f'Task updated: {task.title}')
+        current_app.logger.info('Task updated: %s', task.title)
         return jsonify(task.to_dict()), 200
     
     except Exception as e:
@@ -333,8 +451,9 @@ def delete_task(task_id):
         
         db.session.delete(task)
         db.session.commit()
+        invalidate_dashboard_stats()
         
-        current_app.logger.info(f'Task deleted: {task_title}')
+        current_app.logger.info('Task deleted: %s', task_title)
         return jsonify({'message': 'Task deleted successfully'}), 200
     
     except Exception as e:
@@ -346,42 +465,7 @@ def delete_task(task_id):
 def get_user_tasks(user_id):
     try:
         user = User.query.get_or_404(user_id)
-        
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)
-        status = request.args.get('status')
-        priority = request.args.get('priority')
-        
-        query = Task.query.filter_by(user_id=user_id)
-        
-        if status:
-            try:
-                status_enum = TaskStatus(status)
-                query = query.filter_by(status=status_enum)
-            except ValueError:
-                return jsonify({'error': f'Invalid status: {status}'}), 400
-        
-        if priority:
-            try:
-                priority_enum = TaskPriority(priority)
-                query = query.filter_by(priority=priority_enum)
-            except ValueError:
-                return jsonify({'error': f'Invalid priority: {priority}'}), 400
-        
-        tasks = query.order_by(Task.created_at.desc()).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'user': user.to_dict(),
-            'tasks': [task.to_dict() for task in tasks.items],
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': tasks.total,
-                'pages': tasks.pages
-            }
-        }), 200
+        return task_list_response(user_id, user=user.to_dict())
     
     except Exception as e:
         current_app.logger.error(f'Error fetching tasks for user {user_id}: {str(e)}')
@@ -390,14 +474,11 @@ def get_user_tasks(user_id):
 @api.route('/dashboard-stats', methods=['GET'])
 def get_dashboard_stats():
     try:
-        stats = {
-            'total_users': User.query.count(),
-            'total_tasks': Task.query.count(),
-            'pending_tasks': Task.query.filter_by(status=TaskStatus.PENDING).count(),
-            'in_progress_tasks': Task.query.filter_by(status=TaskStatus.IN_PROGRESS).count(),
-            'completed_tasks': Task.query.filter_by(status=TaskStatus.COMPLETED).count(),
-        }
-        return jsonify(stats), 200
+        stats = compute_dashboard_stats()
+        response = jsonify(stats)
+        response.cache_control.private = True
+        response.cache_control.max_age = 10
+        return response, 200
     except Exception as e:
         current_app.logger.error(f'Error fetching dashboard stats: {str(e)}')
         return jsonify({'error': 'Failed to fetch dashboard stats'}), 500
\ No newline at end of file
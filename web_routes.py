@@ -1,22 +1,18 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from models import db, User, Task, TaskStatus, TaskPriority
+from models import db, User, Task, STATUS_BY_VALUE, PRIORITY_BY_VALUE
 from sqlalchemy import func
+from routes import compute_dashboard_stats
+from queries import build_tasks_query
 
 web = Blueprint('web', __name__)
 
 @web.route('/')
 def index():
     # Get statistics for dashboard
-    stats = {
-        'total_users': User.query.count(),
-        'total_tasks': Task.query.count(),
-        'pending_tasks': Task.query.filter_by(status=TaskStatus.PENDING).count(),
-        'in_progress_tasks': Task.query.filter_by(status=TaskStatus.IN_PROGRESS).count(),
-        'completed_tasks': Task.query.filter_by(status=TaskStatus.COMPLETED).count(),
-    }
+    stats = compute_dashboard_stats()
     
     # Get recent tasks
-    recent_tasks = Task.query.order_by(Task.created_at.desc()).limit(10).all()
+    recent_tasks = db.session.execute(build_tasks_query().limit(10)).scalars().all()
     
     return render_template('index.html', stats=stats, recent_tasks=recent_tasks)
 
@@ -25,34 +21,28 @@ def tasks():
     page = request.args.get('page', 1, type=int)
     per_page = 10
     
-    # Build query with filters
-    query = Task.query
-    
     # Filter by status
     status = request.args.get('status')
+    status_enum = None
     if status:
-        try:
-            status_enum = TaskStatus(status)
-            query = query.filter_by(status=status_enum)
-        except ValueError:
+        status_enum = STATUS_BY_VALUE.get(status)
+        if status_enum is None:
             flash('Invalid status filter', 'error')
     
     # Filter by priority
     priority = request.args.get('priority')
+    priority_enum = None
     if priority:
-        try:
-            priority_enum = TaskPriority(priority)
-            query = query.filter_by(priority=priority_enum)
-        except ValueError:
+        priority_enum = PRIORITY_BY_VALUE.get(priority)
+        if priority_enum is None:
             flash('Invalid priority filter', 'error')
     
     # Filter by user
     user_id = request.args.get('user_id', type=int)
-    if user_id:
-        query = query.filter_by(user_id=user_id)
     
     # Execute query with pagination
-    tasks_pagination = query.order_by(Task.created_at.desc()).paginate(
+    tasks_pagination = db.paginate(
+        build_tasks_query(user_id=user_id, status=status_enum, priority=priority_enum),
         page=page, per_page=per_page, error_out=False
     )
     
@@ -91,8 +81,8 @@ def user_tasks(user_id):
     per_page = 10
     
     # Get user's tasks with pagination
-    tasks_pagination = Task.query.filter_by(user_id=user_id).order_by(Task.created_at.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
+    tasks_pagination = db.paginate(
+        build_tasks_query(user_id=user_id), page=page, per_page=per_page, error_out=False
     )
     
     return render_template('user_tasks.html',